@@ -0,0 +1,233 @@
+"""
+Runs N concurrent GroupChat sessions against the local stub LLM server and
+reports throughput, turn latency and resource usage. Sessions share the
+process-wide Jupyter executor and LLM transport, as Streamlit sessions do.
+Resource columns cover the driver and, with psutil installed, the Jupyter
+gateway and its kernels; "lock" columns show how long cells waited for the
+shared executor.
+
+    python benchmarks/load_test.py --sessions 1 5 10 20 --latency-ms 300 --error-rate 0.02
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.stub_llm_server import start_server, add_config_arguments, config_from_args
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def kernel_processes():
+    """Returns the Jupyter gateway process and its kernels, or [] without psutil."""
+    if psutil is None:
+        return []
+    from utils.utils import server
+    try:
+        gateway = psutil.Process(server._subprocess.pid)
+        return [gateway] + gateway.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return []
+
+
+class ResourceSampler(threading.Thread):
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.peak_rss_mb = 0.0
+        self.peak_threads = 0
+        self.peak_kernel_rss_mb = 0.0
+        # pid -> (first, last) CPU seconds seen; kernels may restart during a run
+        self.kernel_cpu = {}
+
+    def sample_kernel(self):
+        rss = 0
+        for process in kernel_processes():
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    times = process.cpu_times()
+            except psutil.Error:
+                continue
+            cpu = times.user + times.system
+            self.kernel_cpu[process.pid] = (self.kernel_cpu.get(process.pid, (cpu,))[0], cpu)
+        self.peak_kernel_rss_mb = max(self.peak_kernel_rss_mb, rss / 1024 ** 2)
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak_rss_mb = max(self.peak_rss_mb, rss_mb())
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.sample_kernel()
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample_kernel()
+
+    def kernel_cpu_seconds(self):
+        return sum(last - first for first, last in self.kernel_cpu.values())
+
+
+def run_session(result, group_chat_cls, handle_event, dataset_path, requirements, deadline):
+    """Drives one session like main.py does, answering input requests with 'exit'. Fills in `result` as it goes."""
+    state = SimpleNamespace(messages=[], awaiting_response=False, terminated=False, last_agent_name=None)
+    last = time.perf_counter()
+    try:
+        events = group_chat_cls().run(dataset_paths=[dataset_path], user_requirements=requirements)
+        for event in events:
+            handle_event(event, state, requirements)
+            now = time.perf_counter()
+            if event.type in ("text", "tool_call", "tool_response"):
+                result["turn_times"].append(now - last)
+                last = now
+            if state.awaiting_response:
+                event.content.respond("exit")
+                state.awaiting_response = False
+                last = time.perf_counter()
+            if state.terminated:
+                result["completed"] = True
+                break
+            if now > deadline:
+                result["error"] = "timeout"
+                break
+    except Exception as e:
+        result["error"] = repr(e)
+
+
+def run_load(n_sessions, dataset_path, requirements, timeout):
+    from multi_agents.group_chat import GroupChat
+    from utils.events import handle_event
+    from utils.utils import executor_waits
+
+    results = [{"turn_times": [], "completed": False, "error": None} for _ in range(n_sessions)]
+    deadline = time.perf_counter() + timeout
+    executor_waits.clear()
+
+    sampler = ResourceSampler()
+    sampler.start()
+    cpu_start, wall_start = os.times(), time.perf_counter()
+    threads = [
+        threading.Thread(
+            target=run_session,
+            args=(results[i], GroupChat, handle_event, dataset_path, requirements, deadline),
+            daemon=True
+        )
+        for i in range(n_sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread, result in zip(threads, results):
+        # A session stuck waiting for an event (e.g. behind a long cell) never
+        # reaches its own deadline check; its thread is left running in the background
+        thread.join(max(0.0, deadline - time.perf_counter()))
+        if thread.is_alive():
+            result["error"] = "timeout"
+    wall = time.perf_counter() - wall_start
+    cpu_end = os.times()
+    sampler.stop()
+
+    completed = sum(r["completed"] and not r["error"] for r in results)
+    turn_times = [t for r in results for t in r["turn_times"]]
+    waits = list(executor_waits)
+    cpu = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+    return {
+        "sessions": n_sessions,
+        "completed": completed,
+        "errors": [r["error"] for r in results if r["error"]],
+        "wall_s": wall,
+        "turns": len(turn_times),
+        "turns_per_s": len(turn_times) / wall if wall else 0.0,
+        "sessions_per_min": 60 * completed / wall if wall else 0.0,
+        "turn_p50_s": percentile(turn_times, 0.5),
+        "turn_p99_s": percentile(turn_times, 0.99),
+        "cpu_pct": 100 * cpu / wall if wall else 0.0,
+        "peak_rss_mb": sampler.peak_rss_mb,
+        "peak_threads": sampler.peak_threads,
+        "kernel_cpu_pct": 100 * sampler.kernel_cpu_seconds() / wall if wall and psutil else float("nan"),
+        "kernel_rss_mb": sampler.peak_kernel_rss_mb if psutil else float("nan"),
+        "lock_wait_p95_s": percentile(waits, 0.95),
+        "lock_wait_total_s": sum(waits),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10], help="Concurrent sessions per run")
+    parser.add_argument("--dataset", default="data/titanic/train.csv")
+    parser.add_argument("--requirements", default="Please help me to analyse this dataset.")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a run's sessions are cut off")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--base-url", help="Use an already running server instead of starting the stub")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        server = start_server(port=args.port, config=config_from_args(args))
+        base_url = f"http://127.0.0.1:{args.port}/v1"
+    # Must be set before the agents create their OpenAI clients
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    # Importing utils.utils starts the shared Jupyter kernel
+    from utils.llm_transport import transport_metrics
+    from utils.utils import kernel_memory_report
+
+    if psutil is None:
+        print("psutil is not installed: kernel CPU and RSS are not measured.")
+    print(
+        f"{'sess':>5} {'done':>5} {'wall s':>8} {'turns':>6} {'turn/s':>7} {'sess/min':>9} "
+        f"{'p50 s':>7} {'p99 s':>7} {'cpu %':>6} {'rss MB':>7} {'thr':>4} {'wait p95':>9} {'llm err':>8} "
+        f"{'krn cpu %':>10} {'krn rss MB':>11} {'lock p95 s':>11} {'lock tot s':>11} {'kernel MB':>10}"
+    )
+    for n in args.sessions:
+        stub_before = server.RequestHandlerClass.stats.snapshot() if server else None
+        r = run_load(n, args.dataset, args.requirements, args.timeout)
+        transport = transport_metrics()
+        llm_errors = (server.RequestHandlerClass.stats.snapshot()["errors"] - stub_before["errors"]) if server else "-"
+        # Sessions that timed out may still be running a cell
+        kernel = kernel_memory_report(blocking=False)
+        kernel_mb = kernel["total_bytes"] / 1024 ** 2 if kernel else float("nan")
+        print(
+            f"{r['sessions']:>5} {r['completed']:>5} {r['wall_s']:>8.1f} {r['turns']:>6} {r['turns_per_s']:>7.2f} "
+            f"{r['sessions_per_min']:>9.2f} {r['turn_p50_s']:>7.2f} {r['turn_p99_s']:>7.2f} {r['cpu_pct']:>6.0f} "
+            f"{r['peak_rss_mb']:>7.0f} {r['peak_threads']:>4} {transport['queue_wait_p95_s']:>9.2f} {llm_errors:>8} "
+            f"{r['kernel_cpu_pct']:>10.0f} {r['kernel_rss_mb']:>11.0f} {r['lock_wait_p95_s']:>11.2f} {r['lock_wait_total_s']:>11.1f} {kernel_mb:>10.1f}"
+        )
+        for error in sorted(set(r["errors"])):
+            print(f"      {r['errors'].count(error)} session(s) failed: {error}")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Local stand-in for the OpenAI chat-completions API. It follows scripted agent
+trajectories with configurable latency, token rate and error injection, so the
+app can be load-tested without a live API.
+
+    python benchmarks/stub_llm_server.py --port 8765 --latency-ms 300 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub streamlit run main.py
+
+Agents are recognised by the tools they are offered. Each agent's script is
+a list of turns, picked by how many turns that agent already has in the
+conversation (cycling), so the server keeps no per-session state.
+"""
+import re
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Each turn is either {"tool": name, "arguments": {...}} or {"text": "..."}.
+# "{data_path}" is replaced with the first CSV path in the conversation.
+DEFAULT_TRAJECTORY = {
+    "BusinessAnalyst": [
+        {"tool": "get_data_info", "arguments": {"data_path": "{data_path}"}},
+        {"tool": "complete_business_analyst", "arguments": {"output": {
+            "objective": "Understand the main drivers of the target variable to support planning.",
+            "stakeholders_expectations": "Managers will use the findings to prioritise actions.",
+            "research_questions": [
+                "Which variables are most associated with the target?",
+                "How large is the difference between the main segments?"
+            ],
+            "problem_type": "classification"
+        }}},
+    ],
+    "BusinessTranslator": [
+        {"tool": "execute_business_translation_step", "arguments": {"step": {"instruction": "Summarise the dataset and the distribution of the target variable."}}},
+        {"tool": "execute_business_translation_step", "arguments": {"step": {"instruction": "Compare the target rate across the main categorical segments."}}},
+        {"text": "## Recommendations\n- **Focus** on the segments with the highest target rate.\n- **Monitor** the key drivers monthly."},
+    ],
+    "DataScientist": [
+        {"tool": "execute_data_scientist_step", "arguments": {"step": {"instruction": "Load the dataset and print its shape and summary statistics."}}},
+        {"tool": "complete_data_scientist_task", "arguments": {"answer": "The dataset was profiled; summary statistics are in the output above."}},
+    ],
+    "Coder": [
+        {"tool": "run_code", "arguments": {"code": "import pandas as pd\ndf = pd.read_csv('{data_path}')\nprint(df.shape)\nprint(df.describe())"}},
+    ],
+}
+
+# Tools that only one agent is given, used to tell agents apart
+AGENT_TOOLS = {
+    "run_code": "Coder",
+    "execute_data_scientist_step": "DataScientist",
+    "execute_business_translation_step": "BusinessTranslator",
+    "complete_business_analyst": "BusinessAnalyst",
+}
+
+CSV_PATH = re.compile(r"[\w./\\-]+\.csv")
+
+
+class StubConfig:
+    def __init__(self, latency_ms=200, latency_jitter_ms=100, tokens_per_second=80, error_rate=0.0,
+                 error_codes=(429, 500), trajectory=None):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.trajectory = trajectory or DEFAULT_TRAJECTORY
+
+
+class StubStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.by_agent = {}
+
+    def record(self, agent, error):
+        with self.lock:
+            self.requests += 1
+            self.errors += error
+            self.by_agent[agent] = self.by_agent.get(agent, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {"requests": self.requests, "errors": self.errors, "by_agent": dict(self.by_agent)}
+
+
+def _identify_agent(body):
+    key = body.get("prompt_cache_key", "")
+    if key.startswith("auto-ds-"):
+        return key.removeprefix("auto-ds-")
+    for tool in body.get("tools", []):
+        agent = AGENT_TOOLS.get(tool.get("function", {}).get("name"))
+        if agent:
+            return agent
+    return None
+
+
+def _turn_index(messages, agent):
+    # Group chat history carries the speaker's name; tool-call turns are always role "assistant"
+    return sum(
+        1 for m in messages
+        if m.get("role") == "assistant" and m.get("name") in (agent, None)
+    )
+
+
+def _fill(value, data_path):
+    if isinstance(value, str):
+        return value.replace("{data_path}", data_path)
+    if isinstance(value, dict):
+        return {k: _fill(v, data_path) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, data_path) for v in value]
+    return value
+
+
+def _text_of(message):
+    content = message.get("content")
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def build_reply(body, trajectory):
+    """Returns (agent, assistant message) for a chat-completions request body."""
+    messages = body.get("messages", [])
+    agent = _identify_agent(body)
+    script = trajectory.get(agent) if agent else None
+
+    if not script:
+        # Helper calls without tools (e.g. convert_message_to_markdown) get the last message echoed back
+        last = _text_of(messages[-1]) if messages else ""
+        return agent or "helper", {"role": "assistant", "content": last.split(":\n", 1)[-1]}
+
+    turn = script[_turn_index(messages, agent) % len(script)]
+    offered = {t.get("function", {}).get("name") for t in body.get("tools", [])}
+    if "tool" not in turn or turn["tool"] not in offered:
+        return agent, {"role": "assistant", "content": turn.get("text", "Done.")}
+
+    paths = CSV_PATH.findall(" ".join(_text_of(m) for m in messages[:3]))
+    arguments = _fill(turn["arguments"], paths[0] if paths else "data.csv")
+    return agent, {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [{
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": turn["tool"], "arguments": json.dumps(arguments)},
+        }],
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = StubConfig()
+    stats = StubStats()
+    seen_prefixes = set()
+    prefix_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unsupported path {self.path}"}})
+            return
+
+        config = self.config
+        agent, message = build_reply(body, config.trajectory)
+        latency = max(0.0, config.latency_ms + random.uniform(-1, 1) * config.latency_jitter_ms) / 1000
+
+        if random.random() < config.error_rate:
+            self.stats.record(agent, True)
+            time.sleep(latency / 2)
+            status = random.choice(config.error_codes)
+            self._send_json(
+                status,
+                {"error": {"message": "Injected error from the stub server", "type": "stub_error", "code": status}},
+                {"Retry-After": "1"} if status == 429 else None,
+            )
+            return
+
+        prompt_tokens = len(json.dumps([body.get("messages", []), body.get("tools", [])])) // 4
+        completion_tokens = max(1, len(json.dumps(message)) // 4)
+        # Like the real API, the static tools + system prefix is cached after its first use
+        prefix = json.dumps([body.get("tools", []), body.get("messages", [{}])[:1]])
+        prefix_hash = hashlib.sha1(prefix.encode()).hexdigest()
+        with self.prefix_lock:
+            cached = prefix_hash in self.seen_prefixes
+            self.seen_prefixes.add(prefix_hash)
+        cached_tokens = len(prefix) // 4 if cached else 0
+
+        time.sleep(latency + completion_tokens / config.tokens_per_second)
+        self.stats.record(agent, False)
+        self._send_json(200, {
+            "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": min(cached_tokens, prompt_tokens)},
+            },
+        })
+
+
+def start_server(host="127.0.0.1", port=8765, config=None):
+    """Starts the stub in a background thread and returns the server; call shutdown() to stop it."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {
+        "config": config or StubConfig(),
+        "stats": StubStats(),
+        "seen_prefixes": set(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_config_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=200, help="Base latency per completion")
+    parser.add_argument("--latency-jitter-ms", type=float, default=100, help="Uniform jitter around the base latency")
+    parser.add_argument("--tokens-per-second", type=float, default=80, help="Output token generation rate")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an injected error")
+    parser.add_argument("--error-codes", type=int, nargs="+", default=[429, 500], help="Status codes used for injected errors")
+    parser.add_argument("--trajectory", help="JSON file with per-agent scripted turns (see DEFAULT_TRAJECTORY)")
+
+
+def config_from_args(args):
+    trajectory = None
+    if args.trajectory:
+        with open(args.trajectory, encoding="utf-8") as f:
+            trajectory = json.load(f)
+    return StubConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_codes=args.error_codes,
+        trajectory=trajectory,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port, config_from_args(args))
+    print(f"Stub LLM server listening on http://{args.host}:{args.port}/v1")
+    try:
+        while True:
+            time.sleep(10)
+            print(server.RequestHandlerClass.stats.snapshot())
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Replays recorded run_group_chat event streams through the same event handling
+and chat renderer as main.py, without LLMs, a kernel or a browser.
+
+Record a stream by running the app with AUTO_DS_RECORD_EVENTS=1, then:
+
+    python benchmarks/ui_replay.py logs/events/<recording>.jsonl --sizes 50 200 1000
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Streamlit warns about the missing ScriptRunContext on every call made outside
+# `streamlit run`; the level must be set before its config is parsed, which
+# would otherwise reset it.
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+import streamlit.logger
+from utils.events import load_events, deserialize_event, handle_event
+from utils.chat_display import display_group_chat
+
+
+def build_stream(records, size):
+    """
+    Repeats the recorded events until the stream has `size` records, ending
+    with run_completion. Records are deserialized as they are replayed.
+    """
+    body = [r for r in records if r["type"] not in ("run_start", "user_reply", "run_completion", "record_error")]
+    replies = [r["content"] for r in records if r["type"] == "user_reply"] or ["exit"]
+    completion = next(
+        (r for r in records if r["type"] == "run_completion"),
+        {"type": "run_completion", "summary": "Replay finished."}
+    )
+    if not body:
+        raise ValueError("The recording contains no replayable events.")
+
+    stream = [body[i % len(body)] for i in range(size - 1)] + [completion]
+    return stream, replies
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def silence_streamlit_logs():
+    streamlit.logger.set_log_level("error")
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def replay(records, size, user_requirements="", render=True):
+    stream, replies = build_stream(records, size)
+    state = SimpleNamespace(messages=[], awaiting_response=False, terminated=False, last_agent_name=None)
+    event_times = []
+    render_times = []  # (message count, seconds) for each rerun
+    n_requests = 0
+
+    tracemalloc.start()
+    for record in stream:
+        # A JSON round-trip gives every event its own strings, as a live run does,
+        # so message memory grows with the session
+        event = deserialize_event(json.loads(json.dumps(record)))
+        start = time.perf_counter()
+        handle_event(event, state, user_requirements)
+        if state.awaiting_response:
+            # main.py answers input requests on the next rerun, with the next recorded reply
+            event.content.respond(replies[n_requests % len(replies)])
+            n_requests += 1
+            state.awaiting_response = False
+        event_times.append(time.perf_counter() - start)
+
+        if render:
+            # main.py calls st.rerun() after every event, re-rendering the whole chat
+            start = time.perf_counter()
+            display_group_chat(state.messages)
+            render_times.append((len(state.messages), time.perf_counter() - start))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "events": len(stream),
+        "messages": len(state.messages),
+        "event_p50_us": percentile(event_times, 0.5) * 1e6,
+        "event_p99_us": percentile(event_times, 0.99) * 1e6,
+        "event_total_ms": sum(event_times) * 1e3,
+        "render_total_s": sum(t for _, t in render_times),
+        "render_last_ms": render_times[-1][1] * 1e3 if render_times else 0.0,
+        "render_per_message_us": (render_times[-1][1] / max(render_times[-1][0], 1)) * 1e6 if render_times else 0.0,
+        "peak_memory_mb": peak / 1024 ** 2,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", help="JSONL file written by EventRecorder")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000], help="Number of events per session")
+    parser.add_argument("--requirements", help="User requirements of the recorded run (read from the recording by default)")
+    parser.add_argument("--no-render", action="store_true", help="Only measure event handling")
+    args = parser.parse_args()
+
+    records = load_events(args.recording)
+    requirements = args.requirements
+    if requirements is None:
+        requirements = next((r["user_requirements"] for r in records if r["type"] == "run_start"), "")
+
+    # Untimed warm-up: Streamlit initialises lazily on first use, which would
+    # otherwise be charged to whichever size runs first. Its loggers are
+    # silenced again afterwards in case parsing its config reset them.
+    silence_streamlit_logs()
+    replay(records, min(args.sizes), requirements, render=not args.no_render)
+    silence_streamlit_logs()
+    header = f"{'events':>7} {'msgs':>6} {'evt p50 us':>11} {'evt p99 us':>11} {'render s':>9} {'last render ms':>15} {'us/msg':>8} {'peak MB':>8}"
+    print(header)
+    for size in args.sizes:
+        r = replay(records, size, requirements, render=not args.no_render)
+        print(
+            f"{r['events']:>7} {r['messages']:>6} {r['event_p50_us']:>11.1f} {r['event_p99_us']:>11.1f} "
+            f"{r['render_total_s']:>9.2f} {r['render_last_ms']:>15.2f} {r['render_per_message_us']:>8.1f} {r['peak_memory_mb']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
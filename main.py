@@ -1,9 +1,9 @@
 import os
-import json
 import streamlit as st
 from multi_agents.group_chat import GroupChat
 from utils.sidebar import Sidebar
 from utils.utils import display_group_chat
+from utils.events import EventRecorder, handle_event
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
@@ -19,6 +19,8 @@ if "terminated" not in st.session_state:
     st.session_state.terminated = False
 if "last_agent_name" not in st.session_state:
     st.session_state.last_agent_name = None
+if "recorder" not in st.session_state:
+    st.session_state.recorder = None
 
 sidebar = Sidebar()
 st.set_page_config(page_title="🤖 Multi-Agent for Data Science", layout="wide")
@@ -44,12 +46,16 @@ with col2:
             {"role": "User", "content": sidebar.user_requirements}
         )
 
-        group_chat = GroupChat()
+        group_chat = GroupChat(optimize_memory=sidebar.optimize_memory)
 
         st.session_state.events = group_chat.run(
             dataset_paths=sidebar.dataset_paths,
             user_requirements=sidebar.user_requirements
         )
+        # Set AUTO_DS_RECORD_EVENTS=1 to save the event stream for benchmarks/ui_replay.py
+        if os.environ.get("AUTO_DS_RECORD_EVENTS") == "1":
+            st.session_state.recorder = EventRecorder(user_requirements=sidebar.user_requirements)
+            st.session_state.events = st.session_state.recorder.wrap(st.session_state.events)
 
     if st.sidebar.button("🔄 Restart", use_container_width=True, key="restart"):
         del st.session_state.messages
@@ -59,6 +65,8 @@ with col2:
         del st.session_state.user_input
         del st.session_state.terminated
         del st.session_state.last_agent_name
+        del st.session_state.recorder
+        st.session_state.pop("memory_report", None)
         st.rerun()
 
     display_group_chat()
@@ -69,52 +77,11 @@ with col2:
                     with st.spinner("Loading...", show_time=True):
                         st.session_state.event = next(st.session_state.events)
 
-                    if st.session_state.event.type == "text":
-                        sender = st.session_state.event.content.sender
-                        message = st.session_state.event.content.content
-                        if not(sender == "User" and sidebar.user_requirements.strip() in message):
-                            st.session_state.messages.append(
-                                {"role": sender, "content": message}
-                            )
-                        
-                    elif st.session_state.event.type == "tool_call":
-                        if st.session_state.event.content.sender == "Coder":
-                            st.session_state.messages.append(
-                                {
-                                    "role": "Coder", 
-                                    "content": json.loads(st.session_state.event.content.tool_calls[0].function.arguments)["code"],
-                                    "in_expander": True
-                                }
-                            )
-                        else:
-                            st.session_state.last_agent_name = st.session_state.event.content.sender
-                    elif st.session_state.event.type == "tool_response":
-                        if st.session_state.last_agent_name:
-                            st.session_state.messages.append(
-                                {
-                                    "role": st.session_state.last_agent_name, 
-                                    "content": st.session_state.event.content.content,
-                                    "in_expander": st.session_state.last_agent_name != "BusinessAnalyst"
-                                }
-                            )
-                            st.session_state.last_agent_name = None
-                        else:
-                            st.session_state.messages.append(
-                                {
-                                    "role": "System", 
-                                    "content": st.session_state.event.content.content,
-                                    "in_expander": True
-                                }
-                            )
-                    elif st.session_state.event.type == "input_request":
-                        st.session_state.awaiting_response = True
-                    elif st.session_state.event.type == "run_completion":
-                        st.session_state.messages.append(
-                            {"role": "System", "content": st.session_state.event.content}
-                        )
-                        st.session_state.terminated = True
+                    handle_event(st.session_state.event, st.session_state, sidebar.user_requirements)
                 else:
                     st.session_state.event.content.respond(st.session_state.user_input)
+                    if st.session_state.recorder:
+                        st.session_state.recorder.record_reply(st.session_state.user_input)
                     st.session_state.user_input = ""
 
                 st.rerun()
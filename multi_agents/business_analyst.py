@@ -1,10 +1,12 @@
 import os
 from autogen import LLMConfig, AssistantAgent
 from pydantic import BaseModel, Field
-from autogen.agentchat.group import ReplyResult, AgentNameTarget, RevertToUserTarget, ContextVariables
+from autogen.agentchat.group import ReplyResult, AgentNameTarget, RevertToUserTarget, ContextVariables, TerminateTarget
 from typing import Annotated, Literal, List
 import pandas as pd
 from utils.utils import convert_message_to_markdown
+from utils.llm_transport import http_client
+from .loop_controller import get_controller
 
 class BizAnalystOutput(BaseModel):
     objective: str = Field(
@@ -47,12 +49,28 @@ class BizAnalystOutput(BaseModel):
         example="classification"
     )
 
+def _check_business_analysis_budget(context_variables):
+    controller = get_controller(context_variables)
+    if not controller:
+        return None
+    status = controller.budget_status("business_analysis")
+    if status == "ok":
+        return None
+    return ReplyResult(
+        message=controller.budget_message("business_analysis", status),
+        target=TerminateTarget() if status == "hard_stop" else AgentNameTarget("BusinessAnalyst"),
+    )
+
 def request_clarification(
     clarification_question: Annotated[str, "One targeted question to clarify user requirements"],
+    context_variables: ContextVariables,
 ) -> ReplyResult:
     """
     Request clarification from the user when the query is ambiguous
     """
+    over_budget = _check_business_analysis_budget(context_variables)
+    if over_budget:
+        return over_budget
     return ReplyResult(
         message=clarification_question,
         target=RevertToUserTarget(),
@@ -60,7 +78,11 @@ def request_clarification(
 
 def get_data_info(
     data_path: Annotated[str, "Dataset path"],
+    context_variables: ContextVariables,
 ) -> ReplyResult:
+    over_budget = _check_business_analysis_budget(context_variables)
+    if over_budget:
+        return over_budget
     dataset_name = os.path.splitext(os.path.basename(data_path))[0].replace('_', ' ').title()
     df = pd.read_csv(data_path)
     markdown_response = convert_message_to_markdown(f"Take a look at the first few rows of the {dataset_name} dataset:\n {df.head(5)} \n Numerical columns: {df.select_dtypes(include=['number']).columns.tolist()} \n Categorical columns: {df.select_dtypes(include=['object', 'category']).columns.tolist()} \n Total rows: {df.shape[0]}, Total columns: {df.shape[1]}")
@@ -77,6 +99,9 @@ def complete_business_analyst(
     context_variables["research_questions"] = output.research_questions
     context_variables["problem_type"] = output.problem_type
     context_variables["stakeholders_expectations"] = output.stakeholders_expectations
+    controller = get_controller(context_variables)
+    if controller:
+        controller.plan(len(output.research_questions))
     markdown_response = convert_message_to_markdown(f"""The business analysis is complete with the following details:
             - Objective: {output.objective}
             - Stakeholder Expectations: {output.stakeholders_expectations}
@@ -97,6 +122,10 @@ class BusinessAnalyst(AssistantAgent):
             temperature=0.5,
             stream=False,
             parallel_tool_calls=False,
+            http_client=http_client,
+            max_retries=0,
+            # Groups this agent's calls so they are routed to the same prompt cache
+            extra_body={"prompt_cache_key": "auto-ds-BusinessAnalyst"},
         )
         super().__init__(
             name="BusinessAnalyst",
@@ -1,6 +1,8 @@
 from autogen import ConversableAgent, LLMConfig, UpdateSystemMessage
-from autogen.agentchat.group import AgentNameTarget, ContextVariables, RevertToUserTarget,ReplyResult
+from autogen.agentchat.group import AgentNameTarget, ContextVariables, RevertToUserTarget,ReplyResult, TerminateTarget
 from pydantic import BaseModel, Field
+from utils.llm_transport import http_client, CONTEXT_MARKER
+from .loop_controller import get_controller
 
 class BusinessTranslationStep(BaseModel):
     instruction: str = Field(
@@ -20,6 +22,22 @@ def execute_business_translation_step(
     Translate a high-level business task into specific data science objectives.
     Example task: 'Increase customer retention by 10% over the next quarter.'
     """
+    controller = get_controller(context_variables)
+    if controller:
+        status = controller.budget_status("translation")
+        if status != "ok":
+            return ReplyResult(
+                message=controller.budget_message("translation", status),
+                target=TerminateTarget() if status == "hard_stop" else AgentNameTarget("BusinessTranslator"),
+                context_variables=context_variables,
+            )
+        previous_answer = controller.start_request(step.instruction)
+        if previous_answer is not None:
+            return ReplyResult(
+                message=f"The Data Scientist already answered this step:\n{previous_answer}",
+                target=AgentNameTarget("BusinessTranslator"),
+                context_variables=context_variables,
+            )
     return ReplyResult(
         message=f"""
             Data Scientist, please help execute the following business translation step:
@@ -30,6 +48,46 @@ def execute_business_translation_step(
         context_variables=context_variables,
     )
 
+INSTRUCTIONS = """
+    Your role is to interpret analytical results from the Data Scientist and translate them into clear, 
+    actionable business recommendations that tell stakeholders exactly what to do and why. 
+    You act as the bridge between technical findings and strategic decision-making.
+
+    Responsibilities:
+    - Interpret the analytical outputs provided by the Data Scientist, focusing on what the numbers mean for business actions.
+    - Translate statistical results into specific recommendations that describe how stakeholders should act, change, or prioritize.
+    - Avoid vague or generic advice (e.g., “adjust strategy,” “use insights”) — always specify the concrete action, threshold, or adjustment implied by the data.
+    - Avoid technical terminology (e.g., “model,” “algorithm,” “regression,” “cluster”) and instead describe outcomes in plain business language.
+    - Tailor recommendations to each stakeholder group’s goals and decision areas.
+    - Ensure that each recommendation includes a rationale backed by the Data Scientist’s findings (what metric or pattern supports it).
+
+    Workflow:
+    1. Review the Research Questions and analyze the Stakeholder Expectations given at the end of this message to identify key desired outcomes and KPIs.
+    2. For each step in your plan, call execute_business_translation_step to delegate the implementation or computation to the DataScientist agent.
+    3. Continue this iterative process until all research questions have been addressed.
+    4. Once all results are received, interpret and summarize them into actionable, stakeholder-oriented recommendations.
+    5. Present the final recommendations in a structured, statistics-driven, executive-friendly format (e.g., by stakeholder or business theme).
+
+    Rules:
+    - Always return your final answer in Markdown format with proper headings, bullet points, and emphasis for key points.
+    - Do not include technical details (algorithms, preprocessing, or model design).
+    - Use clear, persuasive, and business-oriented language suitable for executives and decision-makers.
+    - Keep recommendations practical, relevant, and impact-focused.
+    - Always ensure traceability from research question → analytical finding → business recommendation.
+"""
+
+# Run-specific context goes after the static instructions so the start of the
+# prompt stays byte-identical between calls and can be served from the
+# provider's prompt cache. CONTEXT_MARKER tells the transport's prefix metric
+# where the static part ends.
+CONTEXT = f"""
+    {CONTEXT_MARKER}
+    Stakeholder Expectations:
+    {{stakeholders_expectations}}
+    Research Questions: 
+    {{research_questions}}
+"""
+
 class BusinessTranslator(ConversableAgent):
     def __init__(self):
         llm_config = LLMConfig(
@@ -37,46 +95,17 @@ class BusinessTranslator(ConversableAgent):
             model="gpt-4.1-mini",
             temperature=0.3,
             stream=False,
-            parallel_tool_calls=False
+            parallel_tool_calls=False,
+            http_client=http_client,
+            max_retries=0,
+            extra_body={"prompt_cache_key": "auto-ds-BusinessTranslator"},
         )
 
         super().__init__(
             name="BusinessTranslator",
             llm_config=llm_config,
             human_input_mode="NEVER",
-            update_agent_state_before_reply=UpdateSystemMessage(
-                """
-                    Your role is to interpret analytical results from the Data Scientist and translate them into clear, 
-                    actionable business recommendations that tell stakeholders exactly what to do and why. 
-                    You act as the bridge between technical findings and strategic decision-making.
-
-                    Stakeholder Expectations:
-                    {stakeholders_expectations}
-                    Research Questions: 
-                    {research_questions}
-
-                    Responsibilities:
-                    - Interpret the analytical outputs provided by the Data Scientist, focusing on what the numbers mean for business actions.
-                    - Translate statistical results into specific recommendations that describe how stakeholders should act, change, or prioritize.
-                    - Avoid vague or generic advice (e.g., “adjust strategy,” “use insights”) — always specify the concrete action, threshold, or adjustment implied by the data.
-                    - Avoid technical terminology (e.g., “model,” “algorithm,” “regression,” “cluster”) and instead describe outcomes in plain business language.
-                    - Tailor recommendations to each stakeholder group’s goals and decision areas.
-                    - Ensure that each recommendation includes a rationale backed by the Data Scientist’s findings (what metric or pattern supports it).
-
-                    Workflow:
-                    1. Review the {research_questions} and analyze {stakeholders_expectations} to identify key desired outcomes and KPIs.
-                    2. For each step in your plan, call execute_business_translation_step to delegate the implementation or computation to the DataScientist agent.
-                    3. Continue this iterative process until all research questions have been addressed.
-                    4. Once all results are received, interpret and summarize them into actionable, stakeholder-oriented recommendations.
-                    5. Present the final recommendations in a structured, statistics-driven, executive-friendly format (e.g., by stakeholder or business theme).
-
-                    Rules:
-                    - Always return your final answer in Markdown format with proper headings, bullet points, and emphasis for key points.
-                    - Do not include technical details (algorithms, preprocessing, or model design).
-                    - Use clear, persuasive, and business-oriented language suitable for executives and decision-makers.
-                    - Keep recommendations practical, relevant, and impact-focused.
-                    - Always ensure traceability from research question → analytical finding → business recommendation.
-                """
-            ),
+            system_message=INSTRUCTIONS,
+            update_agent_state_before_reply=UpdateSystemMessage(INSTRUCTIONS + CONTEXT),
             functions = [execute_business_translation_step]
         )
\ No newline at end of file
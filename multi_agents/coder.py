@@ -1,29 +1,57 @@
 import re
+import itertools
 from pathlib import Path
 from typing import Annotated
 from autogen import AssistantAgent, LLMConfig
-from autogen.coding import CodeBlock
 from autogen.agentchat.group import AgentNameTarget, ReplyResult, ContextVariables, RevertToUserTarget
-from utils.utils import executor
+from utils.utils import execute_code, restart_kernel, kernel_memory_report
+from utils.memory import format_memory_report
+from utils.llm_transport import http_client
+from .loop_controller import get_controller, error_summary
+
+# Successful cells between kernel memory checks; the check is an extra kernel round-trip
+MEMORY_CHECK_INTERVAL = 10
+successful_cells = itertools.count(1)
 
 def run_code(
         code: Annotated[str, "Python code to run in Jupyter"], 
         context_variables: ContextVariables
     ) -> ReplyResult:
+    controller = get_controller(context_variables)
+    if controller:
+        status = controller.budget_status("data_science")
+        if status != "ok":
+            return ReplyResult(
+                message=controller.budget_message("data_science", status),
+                target=AgentNameTarget("BusinessTranslator" if status == "hard_stop" else "DataScientist"),
+            )
+        known_error = controller.known_failure(code)
+        if known_error:
+            # Resubmitting a cell that already failed counts as another failure without running it
+            history = controller.record_failure(code, known_error)
+            if history:
+                return ReplyResult(message=history, target=AgentNameTarget("DataScientist"))
+            return ReplyResult(
+                message=f"This code already failed with:\n{known_error}\nChange the code before running it again.",
+                target=AgentNameTarget("Coder"),
+            )
+
+    optimize_memory = context_variables.get("optimize_memory", True)
     try:
-        result = executor.execute_code_blocks(
-            [CodeBlock(language="python", code=code)]
-        )
+        result = execute_code(code, optimize_memory)
     except Exception as e:
-        executor.restart()
-        result = executor.execute_code_blocks(
-            [CodeBlock(language="python", code=code)]
-        )
+        restart_kernel()
+        result = execute_code(code, optimize_memory)
     except Exception as e:
         return ReplyResult(message=f"Execution failed: {e}", target=RevertToUserTarget())
 
     if result.exit_code == 0:
         msg = f"Output:\n{result.output}"
+        if controller:
+            controller.record_success(result.output)
+        report = kernel_memory_report(deep=False) if next(successful_cells) % MEMORY_CHECK_INTERVAL == 0 else None
+        if report and report["over_budget"]:
+            msg += f"\n\nKernel memory report:\n{format_memory_report(report)}"
         target = AgentNameTarget(context_variables["current_agent"])
     else:
         # Split into lines and clean
@@ -36,6 +64,10 @@ def run_code(
                 break
         msg = "\n".join(errors)
         target = AgentNameTarget("Coder")
+        if controller:
+            history = controller.record_failure(code, error_summary(result.output))
+            if history:
+                msg, target = history, AgentNameTarget("DataScientist")
     return ReplyResult(message=msg, target=target)
 
 
@@ -46,7 +78,10 @@ class Coder(AssistantAgent):
             model="gpt-4.1-mini",
             temperature=0,
             stream=False,
-            parallel_tool_calls=False
+            parallel_tool_calls=False,
+            http_client=http_client,
+            max_retries=0,
+            extra_body={"prompt_cache_key": "auto-ds-Coder"},
         )
         
         super().__init__(
@@ -61,6 +96,8 @@ class Coder(AssistantAgent):
                 Environment:
                 - You are working in a Jupyter Notebook 
                 - Avoid redefining or recreating variables that already exist unless explicitly instructed to do so.
+                - pd.read_csv returns memory-optimized DataFrames: float64 columns are stored as float32 when their values fit exactly, and string columns with few distinct values as category. Call .astype(str) on a category column before filling or assigning values outside its categories, or pass optimize=False to pd.read_csv to load default dtypes.
+                - Call print(format_memory_report(memory_report())) to see how much memory each variable uses, and del variables that are no longer needed.
                 - Reuse context variables passed to you when appropriate.
 
                 Rules:
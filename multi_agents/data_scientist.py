@@ -2,6 +2,8 @@ from autogen import ConversableAgent, LLMConfig, UpdateSystemMessage
 from autogen.agentchat.group import AgentNameTarget, ContextVariables, ReplyResult
 from pydantic import BaseModel, Field
 from typing import Annotated
+from utils.llm_transport import http_client
+from .loop_controller import get_controller
 
 class DataScientistStep(BaseModel):
     instruction: str = Field(
@@ -22,6 +24,22 @@ def execute_data_scientist_step(
     Delegate data scientist tasks to the Coder agent.
     """
     context_variables["current_agent"] = "DataScientist"
+    controller = get_controller(context_variables)
+    if controller:
+        status = controller.budget_status("data_science")
+        if status != "ok":
+            return ReplyResult(
+                message=controller.budget_message("data_science", status),
+                target=AgentNameTarget("BusinessTranslator" if status == "hard_stop" else "DataScientist"),
+                context_variables=context_variables,
+            )
+        previous_output = controller.start_step(step.instruction)
+        if previous_output is not None:
+            return ReplyResult(
+                message=f"This step was already completed. Its output was:\n{previous_output}",
+                target=AgentNameTarget("DataScientist"),
+                context_variables=context_variables,
+            )
     return ReplyResult(
         message=f"""
             Hey Coder! Can you write python code to achieve the following task:
@@ -36,6 +54,9 @@ def complete_data_scientist_task(
     answer: Annotated[str, "The final answer from the Data Scientist agent to the Business Translator agent."],
     context_variables: ContextVariables,
 ) -> ReplyResult:
+    controller = get_controller(context_variables)
+    if controller:
+        controller.record_answer(answer)
     return ReplyResult(
         message="Business Translator! " + answer,
         target=AgentNameTarget("BusinessTranslator"),
@@ -49,7 +70,10 @@ class DataScientist(ConversableAgent):
             model="gpt-4.1-mini",
             temperature=0.3,
             stream=False,
-            parallel_tool_calls=False
+            parallel_tool_calls=False,
+            http_client=http_client,
+            max_retries=0,
+            extra_body={"prompt_cache_key": "auto-ds-DataScientist"},
         )
 
         super().__init__(
@@ -2,14 +2,18 @@ from .business_analyst import BusinessAnalyst
 from .data_scientist import DataScientist
 from .business_translator import BusinessTranslator
 from .coder import Coder
+from .loop_controller import LoopController
 from autogen import UserProxyAgent
 from autogen.agentchat import run_group_chat
 from autogen.agentchat.group.patterns import DefaultPattern
 from autogen.agentchat.group import ContextVariables, RevertToUserTarget, AgentTarget, OnCondition, StringLLMCondition
 
 class GroupChat:
-    def __init__(self):
+    def __init__(self, budgets=None, optimize_memory=True):
+        self.controller = LoopController(budgets)
         context_variables = ContextVariables(data={
+            "run_id": self.controller.run_id,
+            "optimize_memory": optimize_memory,
             "current_agent": "",
             "objective": "",
             "problem_type": "",
@@ -27,6 +31,7 @@ class GroupChat:
         )
 
         business_translator.handoffs.set_after_work(RevertToUserTarget())
+        self.controller.attach([business_analyst, data_scientist, coder, business_translator])
 
         self.pattern = DefaultPattern(
             initial_agent=business_analyst,
@@ -45,7 +50,7 @@ class GroupChat:
         response = run_group_chat(
             pattern=self.pattern,
             messages=message,
-            max_rounds=200
+            max_rounds=self.controller.max_rounds
         )
 
         return response.events
\ No newline at end of file
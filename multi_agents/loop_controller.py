@@ -0,0 +1,166 @@
+import re
+import uuid
+import hashlib
+import weakref
+
+PHASES = {
+    "BusinessAnalyst": "business_analysis",
+    "DataScientist": "data_science",
+    "Coder": "data_science",
+    "BusinessTranslator": "translation",
+}
+# Agent turns per phase. AG2 also counts a round for the group's tool executor
+# after every tool call, so a turn costs about two of AG2's rounds.
+DEFAULT_BUDGETS = {
+    "business_analysis": 10,
+    "data_science": 60,
+    "translation": 15,
+}
+# Data science turns allowed per research question, up to the configured budget
+ROUNDS_PER_QUESTION = 20
+# Turns a phase may overrun after being asked to wrap up before it is cut off
+GRACE_ROUNDS = 5
+# AG2's round cap; the phase budgets stop a run before it is reached
+MAX_ROUNDS = 200
+MAX_REPEATED_ERRORS = 3
+MAX_SAVED_OUTPUT = 2000
+
+BUDGET_MESSAGES = {
+    ("business_analysis", "exhausted"): "The business analysis round budget ({budget}) is used up. Call complete_business_analyst now with your current understanding.",
+    ("business_analysis", "hard_stop"): "Business analysis was stopped after {rounds} rounds without completing.",
+    ("data_science", "exhausted"): "The data science round budget ({budget}) is used up. Call complete_data_scientist_task now with the findings you already have.",
+    ("data_science", "hard_stop"): "Data science was stopped after {rounds} rounds without completing. Write the recommendations from the findings so far and list the questions that remain open.",
+    ("translation", "exhausted"): "The translation round budget ({budget}) is used up. Do not delegate more steps; write the final recommendations now.",
+    ("translation", "hard_stop"): "The analysis was stopped after exceeding its round budget.",
+}
+
+_controllers = weakref.WeakValueDictionary()
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def get_controller(context_variables):
+    """Returns the LoopController of the run these context variables belong to, if any."""
+    run_id = context_variables.get("run_id") if context_variables else None
+    return _controllers.get(run_id) if run_id else None
+
+
+def _fingerprint(text):
+    # Whitespace, blank lines and comments do not change what a cell or instruction does
+    lines = [line.strip() for line in text.splitlines()]
+    normalized = "\n".join(" ".join(line.split()) for line in lines if line and not line.startswith("#"))
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def error_summary(output):
+    """Returns the last non-empty line of a traceback, which names the exception."""
+    lines = [line.strip() for line in ANSI_ESCAPE.sub("", output).splitlines() if line.strip()]
+    return lines[-1] if lines else output
+
+
+def _error_fingerprint(error):
+    # Line numbers and addresses differ between otherwise identical failures
+    return _fingerprint(re.sub(r"0x[0-9a-f]+|\d+", "N", ANSI_ESCAPE.sub("", error)))
+
+
+class LoopController:
+    """
+    Counts each agent's turns per phase as the agents send them and keeps
+    fingerprints of code cells, errors and instructions so the tools can stop
+    Coder/run_code retry loops and repeated steps.
+    """
+
+    def __init__(self, budgets=None, max_repeated_errors=MAX_REPEATED_ERRORS):
+        self.run_id = uuid.uuid4().hex
+        self.configured_budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.budgets = dict(self.configured_budgets)
+        self.max_rounds = min(MAX_ROUNDS, 2 * (sum(self.budgets.values()) + GRACE_ROUNDS * len(self.budgets)))
+        self.rounds = {phase: 0 for phase in self.budgets}
+        self.max_repeated_errors = max_repeated_errors
+
+        self.current_step = None
+        self.step_errors = []
+        self.failed_code = {}
+        self.step_outputs = {}
+        self.current_request = None
+        self.request_answers = {}
+        _controllers[self.run_id] = self
+
+    def attach(self, agents):
+        """Counts the agents' turns on the chat thread, whether or not anyone consumes the event stream."""
+        for agent in agents:
+            agent.register_hook("process_message_before_send", self._count_turn)
+
+    def _count_turn(self, sender, message, recipient, silent):
+        phase = PHASES.get(sender.name)
+        if phase:
+            self.rounds[phase] += 1
+        return message
+
+    def plan(self, n_research_questions):
+        """Scales the data science budget to the number of research questions."""
+        self.budgets["data_science"] = min(
+            self.configured_budgets["data_science"],
+            ROUNDS_PER_QUESTION * max(1, n_research_questions)
+        )
+
+    def budget_status(self, phase):
+        rounds, budget = self.rounds[phase], self.budgets[phase]
+        if rounds >= budget + GRACE_ROUNDS:
+            return "hard_stop"
+        if rounds >= budget:
+            return "exhausted"
+        return "ok"
+
+    def budget_message(self, phase, status):
+        return BUDGET_MESSAGES[(phase, status)].format(rounds=self.rounds[phase], budget=self.budgets[phase])
+
+    def start_request(self, instruction):
+        """Starts a BusinessTranslator request; returns the earlier answer if it was already asked."""
+        self.current_request = _fingerprint(instruction)
+        return self.request_answers.get(self.current_request)
+
+    def record_answer(self, answer):
+        if self.current_request:
+            self.request_answers[self.current_request] = answer[:MAX_SAVED_OUTPUT]
+
+    def start_step(self, instruction):
+        """Starts a DataScientist step; returns the earlier output if the step was already run."""
+        self.current_step = _fingerprint(instruction)
+        self.step_errors = []
+        self.failed_code = {}
+        return self.step_outputs.get(self.current_step)
+
+    def known_failure(self, code):
+        """Returns the error the same cell (ignoring whitespace and comments) already raised in this step."""
+        return self.failed_code.get(_fingerprint(code))
+
+    def record_success(self, output):
+        if self.current_step:
+            self.step_outputs[self.current_step] = output[:MAX_SAVED_OUTPUT]
+        self.step_errors = []
+        # The kernel state changed, so cells that failed before may now run
+        self.failed_code = {}
+
+    def record_failure(self, code, error):
+        """
+        Records a failed cell. Returns a consolidated error history once the
+        same error repeats too often, meaning the step should go back to the
+        DataScientist instead of the Coder.
+        """
+        self.failed_code[_fingerprint(code)] = error
+        fingerprint = _error_fingerprint(error)
+        self.step_errors.append((fingerprint, error))
+
+        repeats = sum(1 for fp, _ in self.step_errors if fp == fingerprint)
+        if repeats < self.max_repeated_errors and len(self.step_errors) < 2 * self.max_repeated_errors:
+            return None
+
+        history = "\n".join(f"{i}. {e}" for i, (_, e) in enumerate(self.step_errors, 1))
+        self.step_errors = []
+        self.failed_code = {}
+        return (
+            "The Coder could not complete this step and was stopped after repeated failures.\n"
+            f"Error history:\n{history}\n"
+            "Change the approach, split the step into smaller steps, or skip it."
+        )
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+events_dir = Path(os.environ.get("AUTO_DS_EVENTS_DIR", "./logs/events"))
+
+
+def handle_event(event, state, user_requirements=""):
+    """
+    Turns a run_group_chat event into chat messages on `state`, which can be
+    st.session_state or any object with the same attributes.
+    """
+    if event.type == "text":
+        sender = event.content.sender
+        message = event.content.content
+        # The initial message repeats the requirements already shown as the first chat message
+        requirements = user_requirements.strip()
+        if not (sender == "User" and requirements and requirements in message):
+            state.messages.append(
+                {"role": sender, "content": message}
+            )
+
+    elif event.type == "tool_call":
+        if event.content.sender == "Coder":
+            state.messages.append(
+                {
+                    "role": "Coder",
+                    "content": json.loads(event.content.tool_calls[0].function.arguments)["code"],
+                    "in_expander": True
+                }
+            )
+        else:
+            state.last_agent_name = event.content.sender
+    elif event.type == "tool_response":
+        if state.last_agent_name:
+            state.messages.append(
+                {
+                    "role": state.last_agent_name,
+                    "content": event.content.content,
+                    "in_expander": state.last_agent_name != "BusinessAnalyst"
+                }
+            )
+            state.last_agent_name = None
+        else:
+            state.messages.append(
+                {
+                    "role": "System",
+                    "content": event.content.content,
+                    "in_expander": True
+                }
+            )
+    elif event.type == "input_request":
+        state.awaiting_response = True
+    elif event.type == "run_completion":
+        state.messages.append(
+            {"role": "System", "content": str(getattr(event.content, "summary", event.content))}
+        )
+        state.terminated = True
+
+
+def serialize_event(event):
+    """Keeps the fields handle_event reads, as plain JSON."""
+    content = event.content
+    record = {"type": event.type, "time": time.time()}
+    if event.type == "text":
+        record["sender"] = content.sender
+        record["content"] = content.content if isinstance(content.content, str) else str(content.content)
+    elif event.type == "tool_call":
+        record["sender"] = content.sender
+        record["tool_calls"] = [
+            {"name": call.function.name, "arguments": call.function.arguments}
+            for call in content.tool_calls
+        ]
+    elif event.type == "tool_response":
+        record["content"] = str(content.content)
+    elif event.type == "input_request":
+        record["prompt"] = getattr(content, "prompt", "")
+    elif event.type == "run_completion":
+        record["summary"] = str(getattr(content, "summary", content))
+    return record
+
+
+def deserialize_event(record):
+    """Rebuilds an object with the attribute layout of the original event."""
+    event_type = record["type"]
+    if event_type == "text":
+        content = SimpleNamespace(sender=record["sender"], content=record["content"])
+    elif event_type == "tool_call":
+        content = SimpleNamespace(
+            sender=record["sender"],
+            tool_calls=[
+                SimpleNamespace(function=SimpleNamespace(name=call["name"], arguments=call["arguments"]))
+                for call in record["tool_calls"]
+            ]
+        )
+    elif event_type == "tool_response":
+        content = SimpleNamespace(content=record["content"])
+    elif event_type == "input_request":
+        content = SimpleNamespace(prompt=record.get("prompt", ""), respond=lambda response: None)
+    elif event_type == "run_completion":
+        content = SimpleNamespace(summary=record["summary"])
+    else:
+        content = SimpleNamespace(**{k: v for k, v in record.items() if k not in ("type", "time")})
+    return SimpleNamespace(type=event_type, content=content)
+
+
+def load_events(path):
+    """Returns the run header, events and user replies of a recording, in order."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class EventRecorder:
+    """
+    Writes run_group_chat events to a JSONL file as they are consumed, along
+    with the user's replies to input requests, so the run can be replayed.
+    """
+
+    def __init__(self, path=None, user_requirements=""):
+        if path is None:
+            events_dir.mkdir(parents=True, exist_ok=True)
+            path = events_dir / f"{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+        self.path = Path(path)
+        # handle_event needs the requirements to filter events the same way on replay
+        self._write({"type": "run_start", "user_requirements": user_requirements, "time": time.time()})
+
+    def _write(self, record):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def wrap(self, events):
+        for event in events:
+            try:
+                self._write(serialize_event(event))
+            except Exception as e:
+                self._write({"type": "record_error", "event_type": getattr(event, "type", None), "error": str(e)})
+            yield event
+
+    def record_reply(self, reply):
+        self._write({"type": "user_reply", "content": reply, "time": time.time()})
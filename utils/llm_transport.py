@@ -0,0 +1,370 @@
+import os
+import json
+import time
+import random
+import hashlib
+import asyncio
+import threading
+import weakref
+from collections import deque
+import httpx
+
+# Limits can be tuned per deployment; tokens-per-minute should match the
+# organisation's rate limits for each model. AUTO_DS_LLM_MODEL_LIMITS takes
+# JSON such as {"gpt-4.1-mini": {"concurrency": 8, "tpm": 200000}}, merged
+# over these defaults; the "default" entry applies to unlisted models.
+MAX_CONCURRENCY = int(os.environ.get("AUTO_DS_LLM_MAX_CONCURRENCY", 16))
+MODEL_LIMITS = {
+    "default": {"concurrency": 4, "tpm": 100_000},
+    "gpt-4.1-mini": {"concurrency": 8, "tpm": 200_000},
+    "gpt-4.1-nano": {"concurrency": 8, "tpm": 200_000},
+}
+for _model, _limit in json.loads(os.environ.get("AUTO_DS_LLM_MODEL_LIMITS", "{}")).items():
+    MODEL_LIMITS[_model] = {**MODEL_LIMITS.get(_model, MODEL_LIMITS["default"]), **_limit}
+MAX_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_COMPLETION_TOKENS = 1024
+# Starts the run-specific part of a system message. Agents with dynamic context
+# put it after this marker; the prefix hash covers only what comes before it.
+CONTEXT_MARKER = "## Run context"
+
+POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60)
+TIMEOUT = httpx.Timeout(120, connect=10)
+
+
+class TokenBucket:
+    """Token-per-minute bucket; reservations may overdraw it and return how long to wait."""
+
+    def __init__(self, tokens_per_minute):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60
+        self.tokens = tokens_per_minute
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(tokens, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, tokens):
+        """Corrects an earlier reservation once the real usage is known."""
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens - tokens)
+
+
+class TransportMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.statuses = {}
+        self.in_flight = 0
+        self.waits = deque(maxlen=1000)
+        self.calls = deque(maxlen=1000)
+        self.cache = {}
+
+    def record_wait(self, seconds):
+        with self.lock:
+            self.waits.append(seconds)
+            self.in_flight += 1
+
+    def record_response(self, status_code, retried):
+        with self.lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.retries += retried
+            self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+
+    def record_call(self, body, usage, latency):
+        """Records token usage, cached prompt tokens and latency for one completed call."""
+        key = body.get("prompt_cache_key") or body.get("model", "unknown")
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        prefix_hash = _prefix_hash(body)
+        with self.lock:
+            self.calls.append({
+                "time": time.time(),
+                "key": key,
+                "model": body.get("model"),
+                "prompt_tokens": prompt_tokens,
+                "cached_tokens": cached_tokens,
+                "completion_tokens": usage.get("completion_tokens") or 0,
+                "latency_s": latency,
+                "prefix_hash": prefix_hash,
+            })
+            stats = self.cache.setdefault(key, {
+                "calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "latency_s": 0.0,
+                "prefix_hash": prefix_hash, "prefix_changes": 0,
+            })
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["cached_tokens"] += cached_tokens
+            stats["latency_s"] += latency
+            if stats["prefix_hash"] != prefix_hash:
+                stats["prefix_hash"] = prefix_hash
+                stats["prefix_changes"] += 1
+
+    def snapshot(self):
+        with self.lock:
+            waits = sorted(self.waits)
+            cache = {
+                key: {
+                    "calls": stats["calls"],
+                    "prompt_tokens": stats["prompt_tokens"],
+                    "cached_tokens": stats["cached_tokens"],
+                    "cache_hit_rate": stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0,
+                    "latency_avg_s": stats["latency_s"] / stats["calls"],
+                    "prefix_changes": stats["prefix_changes"],
+                }
+                for key, stats in self.cache.items()
+            }
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "in_flight": self.in_flight,
+                "statuses": dict(self.statuses),
+                "queue_wait_avg_s": sum(waits) / len(waits) if waits else 0.0,
+                "queue_wait_p95_s": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                "queue_wait_max_s": waits[-1] if waits else 0.0,
+                "cache": cache,
+                "recent_calls": list(self.calls)[-20:],
+            }
+
+
+class Limiter:
+    """Global and per-model concurrency slots plus a token bucket per model."""
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, model_limits=MODEL_LIMITS):
+        self.global_slots = threading.BoundedSemaphore(max_concurrency)
+        self.model_limits = model_limits
+        self.models = {}
+        self.lock = threading.Lock()
+
+    def _model(self, model):
+        with self.lock:
+            if model not in self.models:
+                limit = self.model_limits.get(model, self.model_limits["default"])
+                self.models[model] = (
+                    threading.BoundedSemaphore(limit["concurrency"]),
+                    TokenBucket(limit["tpm"]),
+                )
+            return self.models[model]
+
+    def bucket(self, model):
+        return self._model(model)[1]
+
+    def acquire(self, model, tokens):
+        start = time.monotonic()
+        slots, bucket = self._model(model)
+        time.sleep(bucket.reserve(tokens))
+        slots.acquire()
+        self.global_slots.acquire()
+        return time.monotonic() - start
+
+    async def a_acquire(self, model, tokens):
+        # Polls the shared semaphores so sync and async callers share the same limits
+        start = time.monotonic()
+        slots, bucket = self._model(model)
+        await asyncio.sleep(bucket.reserve(tokens))
+        while not slots.acquire(blocking=False):
+            await asyncio.sleep(0.01)
+        try:
+            while not self.global_slots.acquire(blocking=False):
+                await asyncio.sleep(0.01)
+        except BaseException:
+            # Cancelled while waiting for a global slot: give the model slot back
+            slots.release()
+            raise
+        return time.monotonic() - start
+
+    def release(self, model):
+        self.global_slots.release()
+        self._model(model)[0].release()
+
+
+limiter = Limiter()
+metrics = TransportMetrics()
+
+
+def _parse_body(request):
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _estimate_tokens(body):
+    """Returns a rough prompt + completion token estimate for a request body."""
+    prompt = json.dumps([body.get("messages", body.get("input", "")), body.get("tools", [])])
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    return len(prompt) // 4 + completion
+
+
+def _prefix_hash(body):
+    """Hashes the tool schemas and the system message up to CONTEXT_MARKER, the static prefix that should hit the provider's prompt cache."""
+    messages = body.get("messages") or [{}]
+    system = ""
+    if isinstance(messages[0], dict) and messages[0].get("role") in ("system", "developer"):
+        system = messages[0].get("content") or ""
+        if not isinstance(system, str):
+            system = json.dumps(system)
+    return hashlib.sha1(json.dumps([body.get("tools", []), system.split(CONTEXT_MARKER, 1)[0]]).encode()).hexdigest()[:12]
+
+
+def _usage(response):
+    if "application/json" not in response.headers.get("content-type", ""):
+        return None
+    try:
+        return response.json().get("usage")
+    except (ValueError, AttributeError):
+        return None
+
+
+def _retry_delay(attempt, response=None):
+    backoff = min(30.0, 0.5 * 2 ** attempt)
+    jitter = backoff * random.random()
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        # Retry-After is the earliest the server accepts a retry; jitter only goes on top
+        return float(retry_after) + jitter
+    except (TypeError, ValueError):
+        return backoff / 2 + jitter
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    def __init__(self, transport=None):
+        self.transport = transport or httpx.HTTPTransport(limits=POOL_LIMITS, retries=1)
+
+    def handle_request(self, request):
+        body = _parse_body(request)
+        model, tokens = body.get("model", "unknown"), _estimate_tokens(body)
+        for attempt in range(MAX_RETRIES + 1):
+            metrics.record_wait(limiter.acquire(model, tokens))
+            start = time.monotonic()
+            try:
+                response = self.transport.handle_request(request)
+                if "text/event-stream" not in response.headers.get("content-type", ""):
+                    response.read()
+            except httpx.TransportError as e:
+                # Timeouts and dropped keep-alive connections get the same retries as 429/5xx
+                metrics.record_response("error", attempt > 0)
+                if isinstance(e, httpx.ConnectError):
+                    # The request never reached the server, so it used no tokens
+                    limiter.bucket(model).adjust(-tokens)
+                if attempt == MAX_RETRIES:
+                    raise
+                response = None
+            except BaseException:
+                metrics.record_response("error", attempt > 0)
+                raise
+            finally:
+                limiter.release(model)
+            if response is None:
+                time.sleep(_retry_delay(attempt))
+                continue
+            latency = time.monotonic() - start
+            metrics.record_response(response.status_code, attempt > 0)
+
+            usage = _usage(response)
+            if usage:
+                limiter.bucket(model).adjust((usage.get("total_tokens") or tokens) - tokens)
+                metrics.record_call(body, usage, latency)
+            elif response.status_code >= 400:
+                # Rejected requests use no tokens; refund the reservation so
+                # sustained 429s do not drain the local bucket
+                limiter.bucket(model).adjust(-tokens)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return response
+            response.close()
+            time.sleep(_retry_delay(attempt, response))
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport=None):
+        self.transport = transport or httpx.AsyncHTTPTransport(limits=POOL_LIMITS, retries=1)
+
+    async def handle_async_request(self, request):
+        body = _parse_body(request)
+        model, tokens = body.get("model", "unknown"), _estimate_tokens(body)
+        for attempt in range(MAX_RETRIES + 1):
+            metrics.record_wait(await limiter.a_acquire(model, tokens))
+            start = time.monotonic()
+            try:
+                response = await self.transport.handle_async_request(request)
+                if "text/event-stream" not in response.headers.get("content-type", ""):
+                    await response.aread()
+            except httpx.TransportError as e:
+                # Timeouts and dropped keep-alive connections get the same retries as 429/5xx
+                metrics.record_response("error", attempt > 0)
+                if isinstance(e, httpx.ConnectError):
+                    # The request never reached the server, so it used no tokens
+                    limiter.bucket(model).adjust(-tokens)
+                if attempt == MAX_RETRIES:
+                    raise
+                response = None
+            except BaseException:
+                metrics.record_response("error", attempt > 0)
+                raise
+            finally:
+                limiter.release(model)
+            if response is None:
+                await asyncio.sleep(_retry_delay(attempt))
+                continue
+            latency = time.monotonic() - start
+            metrics.record_response(response.status_code, attempt > 0)
+
+            usage = _usage(response)
+            if usage:
+                limiter.bucket(model).adjust((usage.get("total_tokens") or tokens) - tokens)
+                metrics.record_call(body, usage, latency)
+            elif response.status_code >= 400:
+                # Rejected requests use no tokens; refund the reservation so
+                # sustained 429s do not drain the local bucket
+                limiter.bucket(model).adjust(-tokens)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return response
+            await response.aclose()
+            await asyncio.sleep(_retry_delay(attempt, response))
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class SharedClient(httpx.Client):
+    # Agent configs are deep-copied by autogen; every copy must keep using this pool
+    def __deepcopy__(self, memo):
+        return self
+
+
+class SharedAsyncClient(httpx.AsyncClient):
+    def __deepcopy__(self, memo):
+        return self
+
+
+http_client = SharedClient(transport=RateLimitedTransport(), timeout=TIMEOUT)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_http_client():
+    """Returns the pooled async client for the running event loop (httpx async clients are loop-bound)."""
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        _async_clients[loop] = SharedAsyncClient(transport=AsyncRateLimitedTransport(), timeout=TIMEOUT)
+    return _async_clients[loop]
+
+
+def get_async_openai_client(**kwargs):
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(http_client=get_async_http_client(), max_retries=0, **kwargs)
+
+
+def transport_metrics():
+    return metrics.snapshot()
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import types
+import numpy as np
+import pandas as pd
+
+# Settings shared by the host process and the Jupyter kernel. Both can be
+# overridden with environment variables or at runtime via configure_memory().
+settings = {
+    "optimize": os.environ.get("AUTO_DS_OPTIMIZE_MEMORY", "1") != "0",
+    "categorize": os.environ.get("AUTO_DS_CATEGORIZE_STRINGS", "1") != "0",
+    "max_categories": 50,
+    "category_ratio": 0.05,
+    "budget_mb": float(os.environ.get("AUTO_DS_MEMORY_BUDGET_MB", 2048)),
+}
+
+_original_read_csv = pd.read_csv
+
+# IPython bookkeeping that lives in the kernel's user namespace
+_IGNORED_NAMES = {"In", "Out", "exit", "quit", "get_ipython"}
+
+
+def configure_memory(optimize=None, categorize=None, category_ratio=None, budget_mb=None):
+    """Updates the memory settings and returns the current values."""
+    if optimize is not None:
+        settings["optimize"] = bool(optimize)
+    if categorize is not None:
+        settings["categorize"] = bool(categorize)
+    if category_ratio is not None:
+        settings["category_ratio"] = float(category_ratio)
+    if budget_mb is not None:
+        settings["budget_mb"] = float(budget_mb)
+    return dict(settings)
+
+
+def optimize_dataframe(df, categorize=None, category_ratio=None):
+    """
+    Narrows float64 columns to float32 when every value round-trips exactly
+    and turns string columns with few distinct values into categoricals.
+    Integer columns are left as int64: a narrower type makes products and
+    powers overflow silently.
+    """
+    if categorize is None:
+        categorize = settings["categorize"]
+    if category_ratio is None:
+        category_ratio = settings["category_ratio"]
+    n_rows = len(df)
+
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+
+        if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            continue
+        if pd.api.types.is_float_dtype(dtype) and dtype.itemsize > 4:
+            narrowed = series.to_numpy().astype(np.float32)
+            if np.array_equal(narrowed.astype(dtype), series.to_numpy(), equal_nan=True):
+                df[col] = narrowed
+        elif categorize and dtype == object and n_rows:
+            n_unique = series.nunique(dropna=False)
+            if n_unique <= settings["max_categories"] and n_unique / n_rows <= category_ratio:
+                df[col] = series.astype("category")
+    return df
+
+
+def read_csv(*args, optimize=None, **kwargs):
+    """pandas.read_csv with automatic memory optimization. Pass optimize=False to opt out."""
+    result = _original_read_csv(*args, **kwargs)
+    if optimize is None:
+        optimize = settings["optimize"]
+    if optimize and isinstance(result, pd.DataFrame):
+        result = optimize_dataframe(result)
+    return result
+
+
+def install_read_csv_hook():
+    """Routes pd.read_csv through read_csv so agent code gets optimized frames by default."""
+    pd.read_csv = read_csv
+
+
+def _sizeof(obj, depth=0, seen=None, deep=True):
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=deep).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=deep))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+
+    size = sys.getsizeof(obj, 0)
+    if depth >= 3:
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _sizeof(key, depth + 1, seen, deep) + _sizeof(value, depth + 1, seen, deep)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += _sizeof(item, depth + 1, seen, deep)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        # Fitted models keep their state (coefficients, trees, ...) as attributes
+        size += _sizeof(vars(obj), depth + 1, seen, deep)
+    return size
+
+
+def _describe(obj):
+    if isinstance(obj, pd.DataFrame):
+        return "DataFrame", list(obj.shape)
+    if isinstance(obj, pd.Series):
+        return "Series", list(obj.shape)
+    if isinstance(obj, np.ndarray):
+        return "ndarray", list(obj.shape)
+    if hasattr(obj, "fit") and hasattr(obj, "get_params"):
+        return "model", None
+    return type(obj).__name__, None
+
+
+def memory_report(namespace=None, min_bytes=1024, deep=True):
+    """
+    Reports the memory held by each variable in a namespace (the caller's
+    globals by default, i.e. the kernel's user namespace), largest first.
+    deep=False skips measuring the contents of object columns, which is much
+    faster on large frames but undercounts strings.
+    """
+    if namespace is None:
+        namespace = sys._getframe(1).f_globals
+
+    variables = []
+    for name, obj in list(namespace.items()):
+        if name.startswith("_") or name in _IGNORED_NAMES or isinstance(obj, (types.ModuleType, types.FunctionType, type)):
+            continue
+        if callable(obj) and not hasattr(obj, "fit"):
+            continue
+        size = _sizeof(obj, deep=deep)
+        if size < min_bytes:
+            continue
+        kind, shape = _describe(obj)
+        variables.append({"name": name, "type": kind, "shape": shape, "bytes": size})
+
+    variables.sort(key=lambda v: v["bytes"], reverse=True)
+    total = sum(v["bytes"] for v in variables)
+    budget = int(settings["budget_mb"] * 1024 ** 2)
+    return {
+        "variables": variables,
+        "total_bytes": total,
+        "budget_bytes": budget,
+        "over_budget": total > budget,
+    }
+
+
+def format_bytes(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f} {unit}" if unit != "B" else f"{n} B"
+        n /= 1024
+
+
+def format_memory_report(report, top=10):
+    lines = [f"Total: {format_bytes(report['total_bytes'])} / budget {format_bytes(report['budget_bytes'])}"]
+    for v in report["variables"][:top]:
+        shape = f" {tuple(v['shape'])}" if v["shape"] else ""
+        lines.append(f"- {v['name']} ({v['type']}{shape}): {format_bytes(v['bytes'])}")
+    if report["over_budget"]:
+        lines.append("Memory budget exceeded: delete variables that are no longer needed (del name; import gc; gc.collect()).")
+    return "\n".join(lines)
+
+
+def print_memory_report_json(deep=True):
+    """Used by the host process to query the kernel namespace."""
+    print(json.dumps(memory_report(sys._getframe(1).f_globals, deep=deep)))
@@ -1,5 +1,8 @@
 import os
 import streamlit as st
+from utils.memory import format_bytes
+from utils.utils import kernel_memory_report
+from utils.llm_transport import transport_metrics
 
 class Sidebar:
     """
@@ -16,6 +19,8 @@ class Sidebar:
             # self._get_temperature()
             self._upload_dataset()
             self._get_user_requirements()
+            self._get_memory_settings()
+            self._show_llm_metrics()
             st.markdown(
                 "[View source code](https://github.com/tungbi811/Multi-Agent-Collaboration-for-Automated-Data-Science-Workflows)"
             )
@@ -95,4 +100,58 @@ class Sidebar:
             # value="Can you segment properties into clusters (luxury homes, affordable starter homes, investment-ready properties, etc.)"
         )
 
-    
\ No newline at end of file
+    def _get_memory_settings(self):
+        """Renders the memory optimization toggle and the kernel memory report."""
+        st.subheader("🧮 Memory")
+        self.optimize_memory = st.checkbox(
+            "Optimize DataFrame memory",
+            value=True,
+            help="When loading CSVs, store float columns as 32-bit floats when their values fit exactly and repeated strings as categoricals."
+        )
+        if st.button("Refresh memory report", use_container_width=True, key="refresh_memory_report"):
+            # Do not wait on the kernel while the analysis is running a cell
+            report = kernel_memory_report(blocking=False)
+            if report is None:
+                st.info("The kernel is busy, try again in a moment.")
+            else:
+                st.session_state.memory_report = report
+
+        report = st.session_state.get("memory_report")
+        if report:
+            st.caption(f"Kernel: {format_bytes(report['total_bytes'])} / {format_bytes(report['budget_bytes'])}")
+            st.dataframe(
+                [
+                    {"Variable": v["name"], "Type": v["type"], "Size": format_bytes(v["bytes"])}
+                    for v in report["variables"]
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
+            if report["over_budget"]:
+                st.warning("The kernel is over its memory budget.")
+
+    def _show_llm_metrics(self):
+        """Renders the shared LLM transport's request and queue-wait metrics."""
+        metrics = transport_metrics()
+        with st.expander("📶 LLM Transport", expanded=False):
+            col1, col2 = st.columns(2)
+            col1.metric("Requests", metrics["requests"])
+            col2.metric("Retries", metrics["retries"])
+            col1.metric("In flight", metrics["in_flight"])
+            col2.metric("Queue wait p95", f"{metrics['queue_wait_p95_s']:.2f}s")
+            if metrics["statuses"]:
+                st.caption(", ".join(f"{status}: {count}" for status, count in metrics["statuses"].items()))
+            if metrics["cache"]:
+                st.dataframe(
+                    [
+                        {
+                            "Agent": key.removeprefix("auto-ds-"),
+                            "Calls": stats["calls"],
+                            "Cache hit": f"{stats['cache_hit_rate']:.0%}",
+                            "Latency": f"{stats['latency_avg_s']:.2f}s",
+                        }
+                        for key, stats in metrics["cache"].items()
+                    ],
+                    hide_index=True,
+                    use_container_width=True
+                )
@@ -1,7 +1,13 @@
+import json
+import time
+import threading
+from collections import deque
 from pathlib import Path
+from autogen.coding import CodeBlock
 from autogen.coding.jupyter import LocalJupyterServer, JupyterCodeExecutor
-import streamlit as st
 from autogen import OpenAIWrapper
+from utils.llm_transport import http_client
+from utils.chat_display import ROLE_EMOJI, safe_md, display_group_chat
 
 output_dir = Path("./artifacts")
 output_dir.mkdir(parents=True, exist_ok=True)
@@ -11,23 +17,80 @@ server = LocalJupyterServer(
 )
 executor = JupyterCodeExecutor(server, output_dir=output_dir, timeout=1200)
 
-ROLE_EMOJI = {
-    "User": "🧑‍💻",
-    "BusinessAnalyst": "💼",
-    "BusinessTranslator": "🗣️",
-    "DataAnalyst": "🔎",
-    "DataEngineer": "🛠️",
-    "DataScientist": "📊",
-    "Coder": "🧠",
-    "Assistant": "🤖",
-    "System": "⚙️",
-    "CodeExecutor": "💻",
-}
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# Run in every fresh kernel: makes pd.read_csv memory-optimized by default and
+# exposes memory_report() to the Coder.
+KERNEL_SETUP_CODE = f"""
+import sys
+if {str(ROOT_DIR)!r} not in sys.path:
+    sys.path.insert(0, {str(ROOT_DIR)!r})
+from utils.memory import configure_memory, optimize_dataframe, memory_report, format_memory_report, print_memory_report_json, install_read_csv_hook
+install_read_csv_hook()
+"""
+
+# JupyterCodeExecutor is not thread-safe: the AG2 chat thread runs cells while
+# the Streamlit thread may query the kernel, so every use goes through this lock.
+executor_lock = threading.RLock()
+# Seconds each cell waited for executor_lock, read by benchmarks/load_test.py
+executor_waits = deque(maxlen=1000)
+
+# The kernel's current memory settings, mirrored on the host so they survive
+# kernel restarts. The kernel is shared by every session, so each run's choice
+# is applied before its own cells (see execute_code).
+kernel_memory_settings = {"optimize": True}
+
+def _configure_kernel_memory(optimize):
+    executor.execute_code_blocks([CodeBlock(language="python", code=f"_ = configure_memory(optimize={bool(optimize)})")])
+    kernel_memory_settings["optimize"] = bool(optimize)
+
+def init_kernel():
+    with executor_lock:
+        executor.execute_code_blocks([CodeBlock(language="python", code=KERNEL_SETUP_CODE)])
+        _configure_kernel_memory(kernel_memory_settings["optimize"])
+
+def execute_code(code, optimize_memory=None):
+    """Runs a cell in the shared kernel, first applying the calling run's memory setting if given."""
+    start = time.monotonic()
+    with executor_lock:
+        executor_waits.append(time.monotonic() - start)
+        if optimize_memory is not None and bool(optimize_memory) != kernel_memory_settings["optimize"]:
+            _configure_kernel_memory(optimize_memory)
+        return executor.execute_code_blocks([CodeBlock(language="python", code=code)])
+
+def restart_kernel():
+    with executor_lock:
+        executor.restart()
+        init_kernel()
+
+def kernel_memory_report(deep=True, blocking=True):
+    """
+    Returns the kernel's memory report, or None if it could not be read. With
+    blocking=False it also returns None instead of waiting for a running cell.
+    """
+    if not executor_lock.acquire(blocking=blocking):
+        return None
+    try:
+        result = executor.execute_code_blocks(
+            [CodeBlock(language="python", code=f"print_memory_report_json(deep={bool(deep)})")]
+        )
+    finally:
+        executor_lock.release()
+    if result.exit_code != 0:
+        return None
+    try:
+        return json.loads(result.output.strip().splitlines()[-1])
+    except (json.JSONDecodeError, IndexError):
+        return None
+
+init_kernel()
 
 config_list = [
     {
         "model": "gpt-4.1-nano",
         "api_type": "openai",
+        "http_client": http_client,
+        "max_retries": 0,
     }
 ]
 client = OpenAIWrapper(config_list=config_list)
@@ -44,67 +107,3 @@ def convert_message_to_markdown(message):
         except IndexError:
             pass
     return text.strip()
-
-
-def safe_md(text):
-    return (
-        text.replace("(", "\\(")
-            .replace(")", "\\)")
-            .replace("_", "\\_")
-            .replace("+", "&#43;")
-            .replace("~", "\\~")
-            .replace("$", "\\$")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-    )
-
-def display_group_chat():
-    expander_buffer = []  # temporary buffer for consecutive expander messages
-
-    for msg in st.session_state.messages:
-        role = msg["role"]
-        content = msg["content"]
-        in_expander = msg.get("in_expander", False)
-
-        if in_expander:
-            expander_buffer.append(msg)
-        else:
-            # If we hit a normal message and there are buffered expander messages, render them first
-            if expander_buffer:
-                with st.expander("💡 Detailed Response", expanded=False):
-                    for emsg in expander_buffer:
-                        erole = emsg["role"]
-                        econtent = emsg["content"]
-                        with st.chat_message(erole, avatar=ROLE_EMOJI.get(erole, "")):
-                            st.markdown(f"**{erole}**")
-                            if erole in ["Coder", "System"]:
-                                st.code(econtent)
-                            else:
-                                if "```markdown" in econtent:
-                                    st.write(safe_md(econtent.split("```markdown")[1].split("```")[0].strip()))
-                                else:
-                                    st.write(safe_md(econtent))
-                expander_buffer = []  # reset buffer
-
-            # Render this normal message
-            with st.chat_message(role, avatar=ROLE_EMOJI.get(role, "")):
-                st.markdown(f"**{role}**")
-                if "```markdown" in content:
-                    st.write(safe_md(content.split("```markdown")[1].split("```")[0].strip()))
-                else:
-                    st.write(safe_md(content))
-
-    if expander_buffer:
-        with st.expander("🧠 Thinking ...", expanded=False):
-            for emsg in expander_buffer:
-                erole = emsg["role"]
-                econtent = emsg["content"]
-                with st.chat_message(erole, avatar=ROLE_EMOJI.get(erole, "")):
-                    st.markdown(f"**{erole}**")
-                    if erole in ["Coder", "System"]:
-                        st.code(econtent)
-                    else:
-                        if "```markdown" in econtent:
-                            st.write(safe_md(econtent.split("```markdown")[1].split("```")[0].strip()))
-                        else:
-                            st.write(safe_md(econtent))